@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""
+Compares the per-strike cost of trigger files in a RAM-backed and an
+on-disk runtime directory.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from ships_bell import ShipsBell, runtime_dir
+
+
+def time_strikes(directory, strikes):
+    """Return the mean seconds per strike with triggers in directory."""
+    os.environ["SHIPS_BELL_RUNTIME_DIR"] = directory
+    ships_bell = ShipsBell()
+    # Pretend a watcher is alive, so every strike writes its trigger.
+    ships_bell.watcher_alive = lambda watch_dir: True
+    # The first strike creates the trigger directory.
+    ships_bell.trigger_user_audio("double")
+    start = time.perf_counter()
+    for _ in range(strikes):
+        ships_bell.trigger_user_audio("double")
+    return (time.perf_counter() - start) / strikes
+
+
+def main(args):
+    """Run the benchmark on both directories and print the results."""
+    os.environ.pop("SHIPS_BELL_RUNTIME_DIR", None)
+    parser = argparse.ArgumentParser(args[0], description=__doc__)
+    parser.add_argument(
+        "--tmpfs",
+        type=str,
+        default=runtime_dir(),
+        help="RAM-backed directory (default: the runtime directory)",
+    )
+    parser.add_argument(
+        "--disk",
+        type=str,
+        default=os.path.expanduser("~"),
+        help="On-disk directory (default: the home directory)",
+    )
+    parser.add_argument(
+        "--strikes", type=int, default=10000, help="Strikes per run (default:10000)"
+    )
+    parsed_args = parser.parse_args(args[1:])
+
+    for name, parent in [("tmpfs", parsed_args.tmpfs), ("disk", parsed_args.disk)]:
+        os.makedirs(parent, exist_ok=True)
+        directory = tempfile.mkdtemp(prefix="ships-bell-benchmark-", dir=parent)
+        try:
+            per_strike = time_strikes(directory, parsed_args.strikes)
+        finally:
+            shutil.rmtree(directory)
+        print(f"{name:6} {parent}: {per_strike * 1e6:.1f} us per strike")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -10,6 +10,25 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 INSTALL_DIR="${INSTALL_DIR:-$HOME/.local/share/ships-bell}"
 START_HOUR="${START_HOUR:-9}"
 END_HOUR="${END_HOUR:-20}"
+# Triggers, heartbeats and the control socket. macOS has no per-user tmpfs,
+# the per-user temp dir is at least local and outside the home directory.
+USER_TEMP_DIR="$(getconf DARWIN_USER_TEMP_DIR 2>/dev/null || echo "${TMPDIR:-/tmp}")"
+RUNTIME_DIR="${RUNTIME_DIR:-${USER_TEMP_DIR%/}/ships-bell}"
+
+RELOAD_SERVICES="${RELOAD_SERVICES:-}"
+DRY_RUN="no"
+if [[ "$1" == "--dry-run" ]]; then
+    DRY_RUN="yes"
+fi
+
+# Run a command, or only print it in a dry run
+run() {
+    if [[ "$DRY_RUN" == "yes" ]]; then
+        echo "Would run: $*"
+    else
+        "$@"
+    fi
+}
 
 # Derived paths
 LAUNCH_AGENTS_DIR="$HOME/Library/LaunchAgents"
@@ -19,46 +38,104 @@ WATCHER_PLIST="$LAUNCH_AGENTS_DIR/${CURRENT_USER}.ships-bell-watcher.plist"
 echo "🔔 Installing Ship's Bell macOS Service..."
 echo "User: $CURRENT_USER"
 echo "Install directory: $INSTALL_DIR"
+echo "Runtime directory: $RUNTIME_DIR"
 echo "Schedule: ${START_HOUR}:00 to ${END_HOUR}:00"
 echo ""
 
 # Create installation directory structure
 echo "Creating installation directory structure..."
-mkdir -p "$INSTALL_DIR"
-mkdir -p "$INSTALL_DIR/logs"
-mkdir -p "$INSTALL_DIR/audio"
-mkdir -p "$INSTALL_DIR/triggers"
+run mkdir -p "$INSTALL_DIR"
+run mkdir -p "$INSTALL_DIR/logs"
+run mkdir -p "$INSTALL_DIR/audio"
+run mkdir -p "$INSTALL_DIR/triggers"
+# Ship's Bell and the watcher refuse a runtime dir others can write to
+run mkdir -p "$RUNTIME_DIR/triggers"
+run chmod 700 "$RUNTIME_DIR" "$RUNTIME_DIR/triggers"
 
-# Copy files to installation directory if not already there
-if [[ "$SCRIPT_DIR" != "$INSTALL_DIR" ]]; then
+# Copy files to installation directory if not already there, install.sh
+# syncs only changed files itself
+if [[ "$SCRIPT_DIR" != "$INSTALL_DIR" && "${FILES_SYNCED:-}" != "yes" ]]; then
     echo "Copying files to installation directory..."
-    cp "$SCRIPT_DIR/ships_bell.py" "$INSTALL_DIR/"
-    cp "$SCRIPT_DIR/ships-bell-watcher" "$INSTALL_DIR/"
-    cp -r "$SCRIPT_DIR/audio/"* "$INSTALL_DIR/audio/" 2>/dev/null || echo "No audio files to copy"
-    chmod +x "$INSTALL_DIR/ships-bell-watcher"
+    run cp "$SCRIPT_DIR/ships_bell.py" "$INSTALL_DIR/"
+    run cp "$SCRIPT_DIR/ships-bell-watcher" "$INSTALL_DIR/"
+    run cp -r "$SCRIPT_DIR/audio/"* "$INSTALL_DIR/audio/" 2>/dev/null || echo "No audio files to copy"
+    run chmod +x "$INSTALL_DIR/ships-bell-watcher"
+    RELOAD_SERVICES="bell watcher"
 fi
 
 # Create LaunchAgents directory
-mkdir -p "$LAUNCH_AGENTS_DIR"
+run mkdir -p "$LAUNCH_AGENTS_DIR"
 
 # Generate plist files from templates
 echo "Generating service configuration files..."
 
+# Install a generated plist, print "yes" if it differs from the installed one
+update_plist() {
+    local new_plist="$1"
+    local plist="$2"
+    if [[ -f "$plist" ]] && cmp -s "$new_plist" "$plist"; then
+        rm "$new_plist"
+        echo "no"
+    elif [[ "$DRY_RUN" == "yes" ]]; then
+        rm "$new_plist"
+        echo "yes"
+    else
+        mv "$new_plist" "$plist"
+        echo "yes"
+    fi
+}
+
 # Generate main service plist
-sed "s|{{USER}}|$CURRENT_USER|g; s|{{INSTALL_DIR}}|$INSTALL_DIR|g; s|{{START_HOUR}}|$START_HOUR|g; s|{{END_HOUR}}|$END_HOUR|g" \
-    "$SCRIPT_DIR/com.ike.ships-bell.plist.template" > "$SERVICE_PLIST"
+SERVICE_PLIST_NEW="$(mktemp)"
+sed "s|{{USER}}|$CURRENT_USER|g; s|{{INSTALL_DIR}}|$INSTALL_DIR|g; s|{{RUNTIME_DIR}}|$RUNTIME_DIR|g; s|{{START_HOUR}}|$START_HOUR|g; s|{{END_HOUR}}|$END_HOUR|g" \
+    "$SCRIPT_DIR/com.ike.ships-bell.plist.template" > "$SERVICE_PLIST_NEW"
+SERVICE_CHANGED=$(update_plist "$SERVICE_PLIST_NEW" "$SERVICE_PLIST")
+echo "Bell service configuration changed: $SERVICE_CHANGED"
 
 # Generate watcher service plist
-sed "s|{{USER}}|$CURRENT_USER|g; s|{{INSTALL_DIR}}|$INSTALL_DIR|g" \
-    "$SCRIPT_DIR/com.ike.ships-bell-watcher.plist.template" > "$WATCHER_PLIST"
+WATCHER_PLIST_NEW="$(mktemp)"
+sed "s|{{USER}}|$CURRENT_USER|g; s|{{INSTALL_DIR}}|$INSTALL_DIR|g; s|{{RUNTIME_DIR}}|$RUNTIME_DIR|g" \
+    "$SCRIPT_DIR/com.ike.ships-bell-watcher.plist.template" > "$WATCHER_PLIST_NEW"
+WATCHER_CHANGED=$(update_plist "$WATCHER_PLIST_NEW" "$WATCHER_PLIST")
+echo "Watcher service configuration changed: $WATCHER_CHANGED"
+
+# Load a service, reloading it only if its configuration or code changed
+RELOADED="no"
+load_service() {
+    local name="$1"
+    local label="$2"
+    local plist="$3"
+    local changed="$4"
+    local loaded="no"
+    if launchctl list 2>/dev/null | grep -q "[[:space:]]${label}\$"; then
+        loaded="yes"
+    fi
+    if [[ "$loaded" == "yes" && "$changed" == "no" && " $RELOAD_SERVICES " != *" $name "* ]]; then
+        echo "The $name service is unchanged, not reloading"
+        return
+    fi
+    if [[ "$loaded" == "yes" ]]; then
+        run launchctl unload "$plist" 2>/dev/null || echo "Failed to unload $name service"
+    fi
+    run launchctl load "$plist" 2>/dev/null || echo "The $name service may already be loaded"
+    RELOADED="yes"
+}
 
 # Load the services
 echo "Loading services with launchctl..."
-launchctl load "$SERVICE_PLIST" 2>/dev/null || echo "Service may already be loaded"
-launchctl load "$WATCHER_PLIST" 2>/dev/null || echo "Watcher may already be loaded"
+load_service bell "${CURRENT_USER}.ships-bell" "$SERVICE_PLIST" "$SERVICE_CHANGED"
+load_service watcher "${CURRENT_USER}.ships-bell-watcher" "$WATCHER_PLIST" "$WATCHER_CHANGED"
+
+if [[ "$DRY_RUN" == "yes" ]]; then
+    echo ""
+    echo "✅ Dry run complete, no services were changed."
+    exit 0
+fi
 
 # Wait a moment for services to start
-sleep 2
+if [[ "$RELOADED" == "yes" ]]; then
+    sleep 2
+fi
 
 # Check if services are loaded
 BELL_LOADED=$(launchctl list | grep -q "${CURRENT_USER}.ships-bell" && echo "yes" || echo "no")
@@ -2,6 +2,7 @@
 
 # Ship's Bell - One-Command Installer
 # Can be run directly from GitHub: curl -fsSL https://raw.githubusercontent.com/ike/ships-bell/master/install.sh | bash
+# Or offline from a bundle built by make-bundle.sh: ./install.sh --bundle DIR_OR_TAR_GZ [--dry-run]
 
 set -e
 
@@ -10,12 +11,42 @@ REPO_URL="https://github.com/ike/ships-bell"
 INSTALL_DIR="$HOME/.local/share/ships-bell"
 START_HOUR="${START_HOUR:-9}"
 END_HOUR="${END_HOUR:-20}"
+# Triggers, heartbeats and the control socket. macOS has no per-user tmpfs,
+# the per-user temp dir is at least local and outside the home directory.
+USER_TEMP_DIR="$(getconf DARWIN_USER_TEMP_DIR 2>/dev/null || echo "${TMPDIR:-/tmp}")"
+RUNTIME_DIR="${RUNTIME_DIR:-${USER_TEMP_DIR%/}/ships-bell}"
+BUNDLE="${BUNDLE:-}"
+DRY_RUN="no"
+
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --bundle)
+            BUNDLE="$2"
+            shift 2
+            ;;
+        --dry-run)
+            DRY_RUN="yes"
+            shift
+            ;;
+        *)
+            echo "❌ Unknown option: $1"
+            echo "Usage: $0 [--bundle DIR_OR_TAR_GZ] [--dry-run]"
+            exit 1
+            ;;
+    esac
+done
 
 echo "🔔 Ship's Bell - One-Command Installer"
 echo "======================================"
 echo ""
 echo "This will install Ship's Bell to: $INSTALL_DIR"
 echo "Schedule: ${START_HOUR}:00 to ${END_HOUR}:00"
+if [[ -n "$BUNDLE" ]]; then
+    echo "Source: local bundle $BUNDLE"
+fi
+if [[ "$DRY_RUN" == "yes" ]]; then
+    echo "Dry run: nothing will be changed"
+fi
 echo ""
 
 # Check prerequisites
@@ -29,64 +60,157 @@ fi
 
 echo "✅ Python 3 found: $(python3 --version)"
 
-# Check for download tools
-if command -v curl >/dev/null 2>&1; then
-    DOWNLOAD_CMD="curl"
-elif command -v wget >/dev/null 2>&1; then
-    DOWNLOAD_CMD="wget"
-else
-    echo "❌ Neither curl nor wget found. Please install one of them."
-    exit 1
-fi
+sha256() {
+    if command -v sha256sum >/dev/null 2>&1; then
+        sha256sum "$1" | cut -d' ' -f1
+    else
+        shasum -a 256 "$1" | cut -d' ' -f1
+    fi
+}
+
+# Files are staged here first, then only changed ones are installed.
+STAGE_DIR="$(mktemp -d)"
+trap 'rm -rf "$STAGE_DIR"' EXIT
+MANIFEST="$STAGE_DIR/MANIFEST.sha256"
+
+if [[ -n "$BUNDLE" ]]; then
+    # Offline install from a local bundle
+    if [[ -d "$BUNDLE" ]]; then
+        cp -R "$BUNDLE/." "$STAGE_DIR/"
+    elif [[ -f "$BUNDLE" ]]; then
+        tar -xzf "$BUNDLE" -C "$STAGE_DIR"
+    else
+        echo "❌ Bundle not found: $BUNDLE"
+        exit 1
+    fi
+    if [[ ! -f "$MANIFEST" ]]; then
+        echo "❌ Bundle has no MANIFEST.sha256"
+        exit 1
+    fi
 
-echo "✅ Download tool: $DOWNLOAD_CMD"
+    echo "Verifying bundle checksums..."
+    while read -r hash path; do
+        if [[ ! -f "$STAGE_DIR/$path" || "$(sha256 "$STAGE_DIR/$path")" != "$hash" ]]; then
+            echo "❌ Checksum mismatch in bundle: $path"
+            exit 1
+        fi
+    done < "$MANIFEST"
+    echo "✅ Bundle verified"
+else
+    # Check for download tools
+    if command -v curl >/dev/null 2>&1; then
+        DOWNLOAD_CMD="curl"
+    elif command -v wget >/dev/null 2>&1; then
+        DOWNLOAD_CMD="wget"
+    else
+        echo "❌ Neither curl nor wget found. Please install one of them."
+        exit 1
+    fi
 
-# Create installation directory
-echo ""
-echo "Creating installation directory..."
-mkdir -p "$INSTALL_DIR"
+    echo "✅ Download tool: $DOWNLOAD_CMD"
 
-# Download and extract project
-echo "Downloading Ship's Bell from GitHub..."
+    # Download and extract project
+    echo "Downloading Ship's Bell from GitHub..."
 
-if [[ "$DOWNLOAD_CMD" == "curl" ]]; then
-    if curl -fsSL "${REPO_URL}/archive/master.tar.gz" | tar -xz --strip-components=1 -C "$INSTALL_DIR"; then
-        echo "✅ Downloaded and extracted successfully"
+    if [[ "$DOWNLOAD_CMD" == "curl" ]]; then
+        if curl -fsSL "${REPO_URL}/archive/master.tar.gz" | tar -xz --strip-components=1 -C "$STAGE_DIR"; then
+            echo "✅ Downloaded and extracted successfully"
+        else
+            echo "❌ Failed to download from GitHub. Trying git clone..."
+            if command -v git >/dev/null 2>&1; then
+                rm -rf "$STAGE_DIR"
+                git clone "$REPO_URL.git" "$STAGE_DIR"
+                rm -rf "$STAGE_DIR/.git"
+                echo "✅ Cloned repository successfully"
+            else
+                echo "❌ Git not available. Please install git or curl and try again."
+                exit 1
+            fi
+        fi
     else
-        echo "❌ Failed to download from GitHub. Trying git clone..."
-        if command -v git >/dev/null 2>&1; then
-            rm -rf "$INSTALL_DIR"
-            git clone "$REPO_URL.git" "$INSTALL_DIR"
-            echo "✅ Cloned repository successfully"
+        # wget fallback
+        if wget -qO- "${REPO_URL}/archive/master.tar.gz" | tar -xz --strip-components=1 -C "$STAGE_DIR"; then
+            echo "✅ Downloaded and extracted successfully"
         else
-            echo "❌ Git not available. Please install git or curl and try again."
+            echo "❌ Failed to download. Please check your internet connection."
             exit 1
         fi
     fi
-else
-    # wget fallback
-    if wget -qO- "${REPO_URL}/archive/master.tar.gz" | tar -xz --strip-components=1 -C "$INSTALL_DIR"; then
-        echo "✅ Downloaded and extracted successfully"
+
+    # No manifest in a plain download, hash everything.
+    MANIFEST_TMP="$(mktemp)"
+    (
+        cd "$STAGE_DIR"
+        find . -type f | sed 's|^\./||' | LC_ALL=C sort | while read -r file; do
+            echo "$(sha256 "$file")  $file"
+        done
+    ) > "$MANIFEST_TMP"
+    mv "$MANIFEST_TMP" "$MANIFEST"
+fi
+
+# Install only files whose hash changed
+echo ""
+echo "Comparing with installation directory..."
+if [[ "$DRY_RUN" != "yes" ]]; then
+    mkdir -p "$INSTALL_DIR"
+fi
+UPDATED_FILES=()
+while read -r hash path; do
+    target="$INSTALL_DIR/$path"
+    if [[ -f "$target" && "$(sha256 "$target")" == "$hash" ]]; then
+        continue
+    fi
+    UPDATED_FILES+=("$path")
+    if [[ "$DRY_RUN" == "yes" ]]; then
+        echo "Would update: $path"
     else
-        echo "❌ Failed to download. Please check your internet connection."
-        exit 1
+        mkdir -p "$(dirname "$target")"
+        # Replace by rename, so running scripts keep reading the old file.
+        cp "$STAGE_DIR/$path" "$target.new"
+        mv "$target.new" "$target"
+        echo "Updated: $path"
     fi
+done < "$MANIFEST"
+if [[ "$DRY_RUN" != "yes" ]]; then
+    cp "$MANIFEST" "$INSTALL_DIR/MANIFEST.sha256"
 fi
+echo "✅ ${#UPDATED_FILES[@]} file(s) changed"
+
+# Services running changed code need a restart, even if their plist is unchanged.
+# The watcher imports ships_bell.py as well.
+RELOAD_SERVICES=""
+for path in "${UPDATED_FILES[@]}"; do
+    case "$path" in
+        ships_bell.py) RELOAD_SERVICES="$RELOAD_SERVICES bell watcher" ;;
+        ships-bell-watcher) RELOAD_SERVICES="$RELOAD_SERVICES watcher" ;;
+        audio/*) RELOAD_SERVICES="$RELOAD_SERVICES bell watcher" ;;
+    esac
+done
+
+# Set environment variables for the installer
+export INSTALL_DIR="$INSTALL_DIR"
+export START_HOUR="$START_HOUR"
+export END_HOUR="$END_HOUR"
+export RUNTIME_DIR="$RUNTIME_DIR"
+export RELOAD_SERVICES="$RELOAD_SERVICES"
+export FILES_SYNCED="yes"
 
 # Run the installation
 echo ""
 echo "Running installation script..."
+if [[ "$DRY_RUN" == "yes" ]]; then
+    bash "$STAGE_DIR/install-macos-service.sh" --dry-run
+    echo ""
+    echo "✅ Dry run complete, nothing was changed."
+    exit 0
+fi
+
 cd "$INSTALL_DIR"
 
 # Make scripts executable
 chmod +x install-macos-service.sh
 chmod +x ships-bell-watcher
 
-# Set environment variables for the installer
-export INSTALL_DIR="$INSTALL_DIR"
-export START_HOUR="$START_HOUR"
-export END_HOUR="$END_HOUR"
-
 # Run the installer
 ./install-macos-service.sh
 
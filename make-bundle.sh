@@ -0,0 +1,69 @@
+#!/bin/bash
+
+# Ship's Bell Bundle Builder
+# Stages code, audio and pre-decoded audio with a checksummed manifest, for
+# offline installs: ./install.sh --bundle BUNDLE_DIR
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+BUNDLE_DIR="$1"
+SAMPLE_RATE="${SAMPLE_RATE:-22050}"
+
+FILES=(
+    ships_bell.py
+    ships-bell-watcher
+    install.sh
+    install-macos-service.sh
+    uninstall-macos-service.sh
+    com.ike.ships-bell.plist.template
+    com.ike.ships-bell-watcher.plist.template
+    ships-bell.service.template
+)
+
+if [[ -z "$BUNDLE_DIR" ]]; then
+    echo "Usage: $0 BUNDLE_DIR [--tar]"
+    exit 1
+fi
+
+sha256() {
+    if command -v sha256sum >/dev/null 2>&1; then
+        sha256sum "$1" | cut -d' ' -f1
+    else
+        shasum -a 256 "$1" | cut -d' ' -f1
+    fi
+}
+
+echo "📦 Building Ship's Bell bundle in: $BUNDLE_DIR"
+
+mkdir -p "$BUNDLE_DIR/audio"
+for file in "${FILES[@]}"; do
+    cp "$SCRIPT_DIR/$file" "$BUNDLE_DIR/"
+done
+cp "$SCRIPT_DIR/audio/"*.mp3 "$BUNDLE_DIR/audio/"
+
+echo "Pre-decoding audio at ${SAMPLE_RATE} Hz..."
+if python3 -B -c "import sys; sys.path.insert(0, sys.argv[1]); from ships_bell import ShipsBell; ShipsBell(sys.argv[1]).build_audio_cache(int(sys.argv[2]))" \
+    "$BUNDLE_DIR" "$SAMPLE_RATE" 2>/dev/null; then
+    echo "✅ Pre-decoded audio added"
+else
+    echo "⚠️  No audio decoder found, bundle has no pre-decoded audio"
+fi
+
+echo "Writing manifest..."
+MANIFEST_TMP="$(mktemp)"
+(
+    cd "$BUNDLE_DIR"
+    find . -type f ! -name MANIFEST.sha256 | sed 's|^\./||' | LC_ALL=C sort | while read -r file; do
+        echo "$(sha256 "$file")  $file"
+    done
+) > "$MANIFEST_TMP"
+chmod 644 "$MANIFEST_TMP"
+mv "$MANIFEST_TMP" "$BUNDLE_DIR/MANIFEST.sha256"
+
+if [[ "$2" == "--tar" ]]; then
+    tar -czf "${BUNDLE_DIR%/}.tar.gz" -C "$BUNDLE_DIR" .
+    echo "✅ Bundle archived: ${BUNDLE_DIR%/}.tar.gz"
+fi
+
+echo "✅ Bundle complete: $(wc -l < "$BUNDLE_DIR/MANIFEST.sha256" | tr -d ' ') files"
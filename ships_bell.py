@@ -5,24 +5,109 @@ A little app that plays ship's bell sounds every 30 minutes.
 """
 
 import argparse
+import bisect
+import mmap
 import os
+import queue
+import shutil
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
 import sys
+import tempfile
 import threading
 import time
+import wave
 
 
 class ShipsBellError(Exception):
     """Custom exception for Ship's Bell errors."""
 
 
-class ShipsBell(threading.Thread):
+def runtime_dir():
+    """Return the directory for triggers, heartbeats and the control socket.
+
+    Prefers RAM-backed locations, shared with ships-bell-watcher.
+    """
+    if os.environ.get("SHIPS_BELL_RUNTIME_DIR"):
+        return os.environ["SHIPS_BELL_RUNTIME_DIR"]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "ships-bell")
+    if os.path.isdir("/dev/shm"):
+        return f"/dev/shm/ships-bell-{os.getuid()}"
+    return os.path.expanduser("~/.local/share/ships-bell")
+
+
+def make_private_dir(path):
+    """Create path for this user only.
+
+    Refuses a directory another user could control, e.g. one created ahead
+    of us in the world-writable /dev/shm.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o022
+    ):
+        raise ShipsBellError(f"{path} is not a private directory of this user")
+
+
+class ShipsBell(
+    threading.Thread
+):  # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """Ship's bell timer that plays bell sounds every 30 minutes."""
 
     SECONDS_PER_MINUTE = 60
     MINUTES_PER_HALF_HOUR = 30
     MAX_DOUBLE_STRIKES = 4
-
-    def __init__(self, working_dir=None, start=0, end=24):
+    SECONDS_PER_DAY = 24 * 60 * 60
+    STRIKE_PAUSE = 0.3
+    NOON_PAUSE = 1.0
+
+    AUDIO_FILES = {
+        "double": "DoubleStrike.mp3",
+        "single": "SingleStrike.mp3",
+        "noon": "sir-thats-noon.mp3",
+    }
+    PLAYERS = {
+        "double": "play_double_strike",
+        "single": "play_single_strike",
+        "noon": "play_noon_sound",
+    }
+
+    # Rendering writes 16-bit mono PCM.
+    DEFAULT_SAMPLE_RATE = 22050
+    SAMPLE_WIDTH = 2
+    # Silence is written in chunks of this many seconds.
+    RENDER_CHUNK_SECONDS = 60
+    # RIFF sizes are 32-bit, so WAV output cannot exceed 4 GiB.
+    MAX_WAV_BYTES = 2**32 - 1 - 36
+
+    # Seconds between writing a trigger and its announced start time, enough
+    # for every watcher to notice the trigger and pre-buffer the audio.
+    SYNC_LEAD = 0.5
+    # Watchers write time.time() as a double into this mmap'd file every
+    # HEARTBEAT_INTERVAL seconds.
+    HEARTBEAT_FILE = "heartbeat"
+    HEARTBEAT_FORMAT = "d"
+    HEARTBEAT_INTERVAL = 0.5
+    # A watcher missing a whole heartbeat is considered dead.
+    HEARTBEAT_TIMEOUT = 2 * HEARTBEAT_INTERVAL
+
+    CONTROL_SOCKET_NAME = "control.sock"
+    # Control socket command -> (method, number of arguments).
+    COMMANDS = {
+        "status": ("_status_command", 0),
+        "next-bell": ("_next_bell_command", 0),
+        "stats": ("_stats_command", 0),
+        "ring": ("_ring_command", 1),
+    }
+
+    def __init__(self, working_dir=None, start=0, end=24, clock=time):
         super().__init__()
         self.daemon = True
         # Auto-detect working directory if not provided
@@ -34,39 +119,100 @@ class ShipsBell(threading.Thread):
         self.start_time = start
         self.end_time = end
         self.audio_lock = threading.Lock()
+        # Anything with time(), localtime() and sleep(), e.g. a test clock.
+        self.clock = clock
+        # Set by handle_args() when --render was given.
+        self.render_options = None
+        # Set by handle_args(), None disables the control socket.
+        self.control_socket = None
+        # In-process AudioPlayer for single-process mode, None uses the watcher.
+        self.player = None
+        self.started_at = clock.time()
+        self.stats = {
+            "double": 0,
+            "single": 0,
+            "noon": 0,
+            "errors": 0,
+            "last": None,
+            # Strikes a watcher missed because it was dead.
+            "watcher_down": 0,
+            # Strikes played directly because no watcher was alive.
+            "failovers": 0,
+        }
+        self.watcher_up = True
+        # Direct playback when no watcher is alive, created on first use.
+        self.fallback_player = None
+        # Watch directory -> read-only mmap of its heartbeat file.
+        self._heartbeats = {}
+        self.trigger_dir = os.path.join(runtime_dir(), "triggers")
+        # Created on the first strike, not on every one.
+        self._trigger_dir_created = False
+        # Zone trigger directories, re-read on the heartbeat cadence.
+        self._zone_dirs = None
+        self._zone_dirs_read_at = 0.0
+        # Numbers the triggers, so strikes with the same start time never
+        # replace each other.
+        self._trigger_seq = 0
+        # Minute of day and bell count of every slot in the window, sorted.
+        self.bell_slots = []
+        for slot in range(24 * 60 // ShipsBell.MINUTES_PER_HALF_HOUR):
+            hours, minutes = divmod(slot * ShipsBell.MINUTES_PER_HALF_HOUR, 60)
+            double_strikes, single_strikes = self.compute_strikes(hours, minutes)
+            if self.is_active(hours, minutes):
+                self.bell_slots.append(
+                    (hours * 60 + minutes, double_strikes * 2 + single_strikes)
+                )
+        self._slot_minutes = [minute for minute, _ in self.bell_slots]
 
     def run(self):  # pragma: no cover
         while True:
-            current_time = time.localtime()
-            minutes = current_time.tm_min
-            hours = current_time.tm_hour
-            self.step(hours, minutes)
-            time.sleep(self.compute_sleep_time(minutes))
+            self.tick()
+
+    def tick(self):
+        """Strike the bell if due, then sleep until the next check."""
+        current_time = self.clock.localtime()
+        minutes = current_time.tm_min
+        hours = current_time.tm_hour
+        self.step(hours, minutes)
+        self.clock.sleep(self.compute_sleep_time(minutes))
 
     def step(self, hours, minutes):
         """Check if bell should strike and play appropriate sounds."""
-        if (self.start_time <= hours < self.end_time) or (
+        if self.is_active(hours, minutes):
+            self.play_sequence(self.compute_sequence(hours, minutes))
+
+    def play_sequence(self, sequence):
+        """Play a (pause, strike_type) sequence without interleaving others."""
+        with self.audio_lock:
+            for pause, strike_type in sequence:
+                if pause > 0:
+                    self.clock.sleep(pause)
+                getattr(self, ShipsBell.PLAYERS[strike_type])()
+
+    def is_active(self, hours, minutes):
+        """Check if given time lies within the configured bell window."""
+        return (self.start_time <= hours < self.end_time) or (
             hours == self.end_time and minutes == 0
-        ):
-            # Strike bell at every half or full hour.
-            if (minutes % ShipsBell.MINUTES_PER_HALF_HOUR) == 0:
-                double_strikes, single_strikes = self.compute_strikes(hours, minutes)
-
-                for i in range(double_strikes):
-                    if i > 0:
-                        time.sleep(0.3)
-                    self.play_double_strike()
-                if double_strikes > 0 and single_strikes > 0:
-                    time.sleep(0.3)
-                for i in range(single_strikes):
-                    if i > 0:
-                        time.sleep(0.3)
-                    self.play_single_strike()
-
-                # Play special noon sound after regular bells at 12:00
-                if hours == 12 and minutes == 0:
-                    time.sleep(1.0)  # Brief pause after bells
-                    self.play_noon_sound()
+        )
+
+    @staticmethod
+    def compute_sequence(hours, minutes):
+        """Return the (pause, strike_type) sequence to play at given time.
+
+        The pause is the number of seconds to wait before the strike.
+        """
+        sequence = []
+        # Strike bell at every half or full hour.
+        if (minutes % ShipsBell.MINUTES_PER_HALF_HOUR) == 0:
+            double_strikes, single_strikes = ShipsBell.compute_strikes(hours, minutes)
+            strikes = ["double"] * double_strikes + ["single"] * single_strikes
+            for i, strike_type in enumerate(strikes):
+                sequence.append((ShipsBell.STRIKE_PAUSE if i > 0 else 0.0, strike_type))
+
+            # Play special noon sound after regular bells at 12:00
+            if hours == 12 and minutes == 0:
+                sequence.append((ShipsBell.NOON_PAUSE, "noon"))
+        return sequence
 
     @staticmethod
     def compute_strikes(hours, minutes):
@@ -172,18 +318,431 @@ class ShipsBell(threading.Thread):
         self.trigger_user_audio("noon")
 
     def trigger_user_audio(self, strike_type):
-        """Trigger audio via file system - completely separate from service process."""
-        trigger_dir = os.path.expanduser("~/.local/share/ships-bell/triggers")
-        os.makedirs(trigger_dir, exist_ok=True)
-
-        trigger_file = os.path.join(trigger_dir, f"{strike_type}_strike")
-
-        # Create trigger file - watcher process will detect and play audio
+        """Trigger audio via file system - completely separate from service process.
+
+        In single-process mode, the strike is queued on the in-process player.
+        If no watcher is alive, the strike is played directly instead.
+        """
+        if self.player is not None:
+            self.player.play(strike_type)
+            self._count_strike(strike_type)
+            return
+
+        if not self._trigger_dir_created:
+            make_private_dir(os.path.dirname(self.trigger_dir))
+            os.makedirs(self.trigger_dir, exist_ok=True)
+            self._trigger_dir_created = True
+
+        # Every zone watcher gets its own copy of the trigger.
+        now = self.clock.time()
+        if (
+            self._zone_dirs is None
+            or now - self._zone_dirs_read_at >= ShipsBell.HEARTBEAT_INTERVAL
+        ):
+            self._zone_dirs = self.zone_dirs(self.trigger_dir)
+            self._zone_dirs_read_at = now
+        trigger_dirs = [self.trigger_dir] + self._zone_dirs
+        live_dirs = [d for d in trigger_dirs if self.watcher_alive(d)]
+        # Watchers started together with us may not have beaten yet.
+        while (
+            not live_dirs
+            and self.clock.time() < self.started_at + ShipsBell.HEARTBEAT_TIMEOUT
+        ):
+            self.clock.sleep(ShipsBell.HEARTBEAT_INTERVAL / 10)
+            live_dirs = [d for d in trigger_dirs if self.watcher_alive(d)]
+        self.stats["watcher_down"] += len(trigger_dirs) - len(live_dirs)
+        self._set_watcher_up(bool(live_dirs))
+        if not live_dirs:
+            self._fail_over(strike_type)
+            return
+
+        # Watchers start playing at this time, so all zones ring together.
+        start_at = self.clock.time() + ShipsBell.SYNC_LEAD
+
+        # Create trigger file - watcher process will detect and play audio.
+        # The name carries everything, so a watcher never sees a partial write.
+        self._trigger_seq += 1
+        trigger_name = f"{start_at:.6f}-{self._trigger_seq}_{strike_type}"
         try:
-            with open(trigger_file, "w", encoding="utf-8") as f:
-                f.write(str(time.time()))
+            for directory in live_dirs:
+                os.close(
+                    os.open(
+                        os.path.join(directory, trigger_name),
+                        os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                        0o600,
+                    )
+                )
         except Exception as e:
+            self.stats["errors"] += 1
+            # The runtime directory may have been cleaned up, recreate it.
+            self._trigger_dir_created = False
+            self._zone_dirs = None
             raise ShipsBellError(f"Failed to create trigger file: {e}") from e
+        self._count_strike(strike_type)
+
+    def _fail_over(self, strike_type):
+        """Play a strike directly, as no watcher is alive.
+
+        On macOS this runs in the background bell agent, where audio may be
+        degraded, see LAUNCHAGENT-AUDIO-ISSUE.md. It beats missing the bell.
+        """
+        self.stats["failovers"] += 1
+        if self.fallback_player is None:
+            try:
+                self.fallback_player = AudioPlayer(self.working_dir)
+            except ShipsBellError as e:
+                # Keep the timer thread alive, the next strike tries again.
+                self.stats["errors"] += 1
+                print(f"Cannot fail over: {e}", file=sys.stderr)
+                return
+            self.fallback_player.start()
+        self.fallback_player.play(strike_type)
+        self._count_strike(strike_type)
+
+    def _count_strike(self, strike_type):
+        self.stats[strike_type] += 1
+        self.stats["last"] = self.clock.time()
+
+    def _set_watcher_up(self, watcher_up):
+        if watcher_up != self.watcher_up:
+            if watcher_up:
+                print("Watcher is alive again.", file=sys.stderr)
+            else:
+                print("No watcher alive, playing bells directly.", file=sys.stderr)
+        self.watcher_up = watcher_up
+
+    def watcher_alive(self, watch_dir):
+        """Check the heartbeat of the watcher of a trigger directory."""
+        heartbeat = self._heartbeats.get(watch_dir)
+        if heartbeat is None:
+            heartbeat_file = os.path.join(watch_dir, ShipsBell.HEARTBEAT_FILE)
+            try:
+                with open(heartbeat_file, "rb") as f:
+                    heartbeat = mmap.mmap(
+                        f.fileno(),
+                        struct.calcsize(ShipsBell.HEARTBEAT_FORMAT),
+                        access=mmap.ACCESS_READ,
+                    )
+            except (OSError, ValueError):
+                return False
+            self._heartbeats[watch_dir] = heartbeat
+
+        (beat,) = struct.unpack_from(ShipsBell.HEARTBEAT_FORMAT, heartbeat)
+        if self.clock.time() - beat <= ShipsBell.HEARTBEAT_TIMEOUT:
+            return True
+        # The file may have been replaced by a restarted watcher, map it again.
+        del self._heartbeats[watch_dir]
+        heartbeat.close()
+        return False
+
+    @staticmethod
+    def zone_dirs(trigger_dir):
+        """Return the trigger directories registered by zone watchers."""
+        zones_dir = os.path.join(trigger_dir, "zones")
+        try:
+            return [entry.path for entry in os.scandir(zones_dir) if entry.is_dir()]
+        except FileNotFoundError:
+            return []
+
+    def next_bell(self, now=None):
+        """Return (hours, minutes, bells, seconds_until) of the next bell.
+
+        Returns None if the window contains no bells.
+        """
+        if not self.bell_slots:
+            return None
+        if now is None:
+            now = self.clock.localtime()
+        second_of_day = (now.tm_hour * 60 + now.tm_min) * 60 + now.tm_sec
+        index = bisect.bisect_right(self._slot_minutes, second_of_day // 60)
+        # A bell at the current minute has already rung or is ringing.
+        if index < len(self.bell_slots):
+            minute, bells = self.bell_slots[index]
+            seconds_until = minute * 60 - second_of_day
+        else:
+            minute, bells = self.bell_slots[0]
+            seconds_until = ShipsBell.SECONDS_PER_DAY + minute * 60 - second_of_day
+        return (minute // 60, minute % 60, bells, seconds_until)
+
+    def handle_command(self, command):
+        """Answer a control socket command with a single line."""
+        words = command.split()
+        if not words or words[0] not in ShipsBell.COMMANDS:
+            return f"error unknown command: {command.strip()}"
+        method, arg_count = ShipsBell.COMMANDS[words[0]]
+        if len(words) - 1 != arg_count:
+            return f"error {words[0]} takes {arg_count} argument(s)"
+        try:
+            return getattr(self, method)(*words[1:])
+        except ShipsBellError as e:
+            return f"error {e}"
+
+    def _status_command(self):
+        return (
+            f"ok running from={self.start_time} to={self.end_time} "
+            f"uptime={int(self.clock.time() - self.started_at)} "
+            f"watcher={'up' if self.watcher_up else 'down'}"
+        )
+
+    def _next_bell_command(self):
+        next_bell = self.next_bell()
+        if next_bell is None:
+            return "ok none"
+        hours, minutes, bells, seconds_until = next_bell
+        return f"ok {hours:02d}:{minutes:02d} bells={bells} in={seconds_until}"
+
+    def _stats_command(self):
+        return "ok " + " ".join(f"{k}={v}" for k, v in self.stats.items())
+
+    def _ring_command(self, bells):
+        max_bells = 2 * ShipsBell.MAX_DOUBLE_STRIKES
+        if not bells.isdigit() or not 1 <= int(bells) <= max_bells:
+            raise ShipsBellError(f"bells must be in range 1..{max_bells}")
+        bells = int(bells)
+        strikes = ["double"] * (bells // 2) + ["single"] * (bells % 2)
+        self.play_sequence(
+            (ShipsBell.STRIKE_PAUSE if i > 0 else 0.0, strike_type)
+            for i, strike_type in enumerate(strikes)
+        )
+        return f"ok rang {bells}"
+
+    def start_control_server(self, socket_path):
+        """Serve control commands on a Unix socket from a daemon thread."""
+        socket_path = os.path.expanduser(socket_path)
+        make_private_dir(os.path.dirname(socket_path))
+        if os.path.lexists(socket_path):
+            if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+                raise ShipsBellError(f"{socket_path} exists and is not a socket")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(socket_path)
+                except ConnectionRefusedError:
+                    # Left behind by a process that died, take it over.
+                    os.remove(socket_path)
+                else:
+                    raise ShipsBellError(
+                        f"Control socket {socket_path} is in use by another "
+                        "Ship's Bell, pass --control-socket '' to run without one"
+                    )
+        server = ControlServer(socket_path, self)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
+
+    def _audio_cache_file(self, strike_type, sample_rate):
+        """Return the path of the pre-decoded PCM for strike type."""
+        return os.path.join(
+            self.working_dir, "audio", "cache", f"{strike_type}-{sample_rate}.pcm"
+        )
+
+    def build_audio_cache(self, sample_rate=DEFAULT_SAMPLE_RATE):
+        """Pre-decode all bundled MP3s, so rendering needs no decoder."""
+        for strike_type in ShipsBell.AUDIO_FILES:
+            data = self.decode_audio(strike_type, sample_rate, use_cache=False)
+            cache_file = self._audio_cache_file(strike_type, sample_rate)
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, "wb") as f:
+                f.write(data)
+
+    def decode_audio(self, strike_type, sample_rate, use_cache=True):
+        """Decode the bundled MP3 for strike type to 16-bit mono PCM bytes."""
+        cache_file = self._audio_cache_file(strike_type, sample_rate)
+        if use_cache and os.path.exists(cache_file):
+            with open(cache_file, "rb") as f:
+                return f.read()
+
+        audio_file = os.path.join(
+            self.working_dir, "audio", ShipsBell.AUDIO_FILES[strike_type]
+        )
+        if not os.path.exists(audio_file):
+            raise ShipsBellError(f"Audio file not found: {audio_file}")
+
+        try:
+            if shutil.which("ffmpeg"):
+                return subprocess.run(
+                    ["ffmpeg", "-v", "error", "-i", audio_file, "-ac", "1"]
+                    + ["-ar", str(sample_rate), "-f", "s16le", "-"],
+                    capture_output=True,
+                    check=True,
+                ).stdout
+            if shutil.which("afconvert"):
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    wav_file = os.path.join(tmp_dir, f"{strike_type}.wav")
+                    subprocess.run(
+                        ["afconvert", "-f", "WAVE", "-c", "1"]
+                        + ["-d", f"LEI16@{sample_rate}", audio_file, wav_file],
+                        capture_output=True,
+                        check=True,
+                    )
+                    with wave.open(wav_file, "rb") as f:
+                        return f.readframes(f.getnframes())
+        except subprocess.CalledProcessError as e:
+            raise ShipsBellError(f"Failed to decode {audio_file}: {e}") from e
+        raise ShipsBellError("No audio decoder found, need ffmpeg or afconvert.")
+
+    def compute_schedule(self, days=1):
+        """Yield (second, strike_type) for every strike in the next days.
+
+        Seconds are counted from midnight of the first day.
+        """
+        for day in range(days):
+            for minute_of_day, _ in self.bell_slots:
+                hours, minutes = divmod(minute_of_day, 60)
+                slot_start = day * ShipsBell.SECONDS_PER_DAY + minute_of_day * 60
+                offset = 0.0
+                for pause, strike_type in self.compute_sequence(hours, minutes):
+                    offset = round(offset + pause, 6)
+                    yield (slot_start + offset, strike_type)
+
+    def render(self, output_path, days=1, sample_rate=DEFAULT_SAMPLE_RATE):
+        """Render days of bells into a WAV or FLAC file.
+
+        Silence is generated in fixed-size chunks, so memory use does not
+        depend on the length of the track.
+        """
+        clips = {
+            strike_type: self.decode_audio(strike_type, sample_rate)
+            for strike_type in ShipsBell.AUDIO_FILES
+        }
+        total_frames = days * ShipsBell.SECONDS_PER_DAY * sample_rate
+
+        if output_path.lower().endswith(".flac"):
+            encoder = self._open_flac_encoder(output_path, sample_rate)
+            try:
+                self._render_frames(encoder.stdin.write, clips, days, sample_rate)
+                encoder.stdin.close()
+            except BrokenPipeError as e:
+                raise ShipsBellError(
+                    f"FLAC encoder exited writing {output_path}"
+                ) from e
+            finally:
+                self._close_encoder(encoder)
+            if encoder.returncode != 0:
+                raise ShipsBellError(f"Failed to encode {output_path}")
+            return total_frames
+
+        if total_frames * ShipsBell.SAMPLE_WIDTH > ShipsBell.MAX_WAV_BYTES:
+            raise ShipsBellError(
+                "Track too long for WAV, use a .flac output or a lower sample rate."
+            )
+        with wave.Wave_write(output_path) as f:
+            f.setnchannels(1)
+            f.setsampwidth(ShipsBell.SAMPLE_WIDTH)
+            f.setframerate(sample_rate)
+            f.setnframes(total_frames)
+            self._render_frames(f.writeframesraw, clips, days, sample_rate)
+        return total_frames
+
+    @staticmethod
+    def _open_flac_encoder(output_path, sample_rate):
+        """Start an external FLAC encoder reading raw PCM from stdin."""
+        if shutil.which("flac"):
+            command = ["flac", "--silent", "--force", "--force-raw-format"]
+            command += ["--endian=little", "--sign=signed", "--channels=1"]
+            command += ["--bps=16", f"--sample-rate={sample_rate}"]
+            command += ["-o", output_path, "-"]
+        elif shutil.which("ffmpeg"):
+            command = ["ffmpeg", "-v", "error", "-y", "-f", "s16le"]
+            command += ["-ar", str(sample_rate), "-ac", "1", "-i", "-", output_path]
+        else:
+            raise ShipsBellError("No FLAC encoder found, need flac or ffmpeg.")
+        return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    @staticmethod
+    def _close_encoder(encoder):
+        """Close the encoder's stdin and wait for it, even if it has died."""
+        try:
+            encoder.stdin.close()
+        except BrokenPipeError:
+            # Buffered PCM is lost, the returncode reports the failure.
+            pass
+        encoder.wait()
+
+    def _render_frames(self, write, clips, days, sample_rate):
+        """Write the PCM stream for days of bells through write()."""
+        frame_bytes = ShipsBell.SAMPLE_WIDTH
+        total_bytes = days * ShipsBell.SECONDS_PER_DAY * sample_rate * frame_bytes
+        silence = bytes(ShipsBell.RENDER_CHUNK_SECONDS * sample_rate * frame_bytes)
+        position = 0
+
+        def write_silence(until):
+            nonlocal position
+            until = min(until, total_bytes)
+            while position < until:
+                chunk = min(len(silence), until - position)
+                write(silence[:chunk] if chunk < len(silence) else silence)
+                position += chunk
+
+        for second, strike_type in self.compute_schedule(days):
+            write_silence(round(second * sample_rate) * frame_bytes)
+            clip = clips[strike_type][: max(total_bytes - position, 0)]
+            write(clip)
+            position += len(clip)
+        write_silence(total_bytes)
+
+
+class AudioPlayer(threading.Thread):
+    """In-process player playing queued strikes one after another."""
+
+    # Tried in order, the audio file is appended.
+    PLAYER_COMMANDS = [
+        ["afplay"],
+        ["mpg123", "-q"],
+        ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"],
+    ]
+
+    def __init__(self, working_dir, command=None):
+        super().__init__()
+        self.daemon = True
+        self.working_dir = working_dir
+        self.command = command if command is not None else self.find_command()
+        self.queue = queue.Queue()
+
+    @staticmethod
+    def find_command():
+        """Return the first available player command."""
+        for command in AudioPlayer.PLAYER_COMMANDS:
+            if shutil.which(command[0]):
+                return command
+        raise ShipsBellError("No audio player found, need afplay, mpg123 or ffplay.")
+
+    def run(self):  # pragma: no cover
+        while True:
+            self.play_now(self.queue.get())
+
+    def play(self, strike_type):
+        """Queue a strike, returns immediately."""
+        self.queue.put(strike_type)
+
+    def play_now(self, strike_type):
+        """Play a strike and wait until it has finished."""
+        audio_file = os.path.join(
+            self.working_dir, "audio", ShipsBell.AUDIO_FILES[strike_type]
+        )
+        try:
+            subprocess.run(self.command + [audio_file], capture_output=True, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error playing {audio_file}: {e}", file=sys.stderr)
+
+
+class ControlRequestHandler(socketserver.StreamRequestHandler):
+    """Answer one command per line until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            command = line.decode("utf-8", errors="replace")
+            reply = self.server.ships_bell.handle_command(command)
+            self.wfile.write(f"{reply}\n".encode("utf-8"))
+
+
+class ControlServer(socketserver.ThreadingUnixStreamServer):
+    """Control socket server answering from a ShipsBell's state."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, ships_bell):
+        self.ships_bell = ships_bell
+        super().__init__(socket_path, ControlRequestHandler)
 
 
 def handle_args(args):
@@ -209,6 +768,36 @@ def handle_args(args):
         type=str,
         help="Working directory for audio files (auto-detected if not provided)",
     )
+    parser.add_argument(
+        "--render",
+        type=str,
+        metavar="FILE",
+        help="Render the bells to a .wav or .flac file instead of ringing them",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=1,
+        help="Number of days to render (default:1)",
+    )
+    parser.add_argument(
+        "--sample-rate",
+        type=int,
+        default=ShipsBell.DEFAULT_SAMPLE_RATE,
+        help=f"Sample rate of rendered audio (default:{ShipsBell.DEFAULT_SAMPLE_RATE})",
+    )
+    parser.add_argument(
+        "--control-socket",
+        type=str,
+        default=os.path.join(runtime_dir(), ShipsBell.CONTROL_SOCKET_NAME),
+        help="Unix socket answering status queries, empty to disable "
+        f"(default:<runtime dir>/{ShipsBell.CONTROL_SOCKET_NAME})",
+    )
+    parser.add_argument(
+        "--single-process",
+        action="store_true",
+        help="Play audio in this process instead of via ships-bell-watcher",
+    )
     parsed_args = parser.parse_args(args[1:])
     from_hour = getattr(parsed_args, "from")
     to_hour = getattr(parsed_args, "to")
@@ -221,7 +810,20 @@ def handle_args(args):
             "Value of 'to' hour must be greater than or equal to value of 'from' hour."
         )
 
-    return ShipsBell(working_dir, from_hour, to_hour)
+    if parsed_args.days < 1 or parsed_args.sample_rate < 1:
+        raise ShipsBellError("Days and sample rate must be positive.")
+
+    ships_bell = ShipsBell(working_dir, from_hour, to_hour)
+    ships_bell.control_socket = parsed_args.control_socket or None
+    if parsed_args.single_process:
+        ships_bell.player = AudioPlayer(ships_bell.working_dir)
+    if parsed_args.render is not None:
+        ships_bell.render_options = {
+            "output_path": parsed_args.render,
+            "days": parsed_args.days,
+            "sample_rate": parsed_args.sample_rate,
+        }
+    return ships_bell
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -229,6 +831,13 @@ if __name__ == "__main__":  # pragma: no cover
     # Now start app.
     try:
         SHIPS_BELL = handle_args(sys.argv)
+        if SHIPS_BELL.render_options is not None:
+            SHIPS_BELL.render(**SHIPS_BELL.render_options)
+            sys.exit(0)
+        if SHIPS_BELL.control_socket is not None:
+            SHIPS_BELL.start_control_server(SHIPS_BELL.control_socket)
+        if SHIPS_BELL.player is not None:
+            SHIPS_BELL.player.start()
         # Play double-strike at startup, mainly to detect a missing MP3 player.
         SHIPS_BELL.play_double_strike()
         SHIPS_BELL.start()
@@ -0,0 +1,72 @@
+"""Virtual time and recording players for the Ship's Bell tests."""
+
+import os
+import struct
+import time
+
+from ships_bell import ShipsBell
+
+
+class VirtualClock:
+    """Time source whose sleep() returns at once and advances time.
+
+    Local time is UTC, so schedules do not depend on the machine's time zone.
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def time(self):
+        """Return the virtual time in seconds since the epoch."""
+        return self.now
+
+    def localtime(self, seconds=None):
+        """Return the virtual time, or seconds, as a struct_time."""
+        return time.gmtime(self.now if seconds is None else seconds)
+
+    def sleep(self, seconds):
+        """Advance the virtual time without waiting."""
+        self.now += seconds
+
+
+class RecordingPlayer:
+    """Player recording (time, strike_type) instead of playing.
+
+    Accepted as ShipsBell.player and, via play_audio, as the play function
+    of the watcher's handle_triggers().
+    """
+
+    def __init__(self, clock=time, duration=0.0):
+        self.clock = clock
+        # Seconds a watcher playback takes, or a dict of them by strike type.
+        # A slow player holds up the backlog.
+        self.duration = duration
+        self.played = []
+
+    def play(self, strike_type):
+        """Record a strike at the current time."""
+        self.played.append((self.clock.time(), strike_type))
+
+    def play_audio(
+        self, audio_file, start_at=None, player=None, max_duration=None
+    ):  # pylint: disable=unused-argument
+        """Record a watcher playback of audio_file, waiting until start_at."""
+        if start_at is None:
+            start_at = self.clock.time()
+        self.clock.sleep(max(0.0, start_at - self.clock.time()))
+        duration = self.duration
+        for strike_type, name in ShipsBell.AUDIO_FILES.items():
+            if os.path.basename(audio_file) == name:
+                self.played.append((start_at, strike_type))
+                if isinstance(duration, dict):
+                    duration = duration[strike_type]
+        if max_duration is not None:
+            duration = min(duration, max_duration)
+        self.clock.sleep(duration)
+        return 0.0
+
+
+def write_heartbeat(watch_dir, timestamp):
+    """Beat for a watcher of watch_dir at timestamp, without running one."""
+    with open(os.path.join(watch_dir, ShipsBell.HEARTBEAT_FILE), "wb") as f:
+        f.write(struct.pack(ShipsBell.HEARTBEAT_FORMAT, timestamp))
@@ -1,7 +1,9 @@
 """Tests for Ship's Bell installer scripts."""
 
+import hashlib
 import os
 import shutil
+import stat
 import subprocess
 import tempfile
 import unittest
@@ -15,6 +17,9 @@ class TestInstallers(unittest.TestCase):  # pylint: disable=too-many-public-meth
         """Set up test environment."""
         self.test_dir = tempfile.mkdtemp()
         self.script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.home = os.path.join(self.test_dir, "home")
+        self.bin_dir = os.path.join(self.test_dir, "bin")
+        self.calls = os.path.join(self.test_dir, "calls")
 
     def tearDown(self):
         """Clean up test environment."""
@@ -114,6 +119,10 @@ class TestInstallers(unittest.TestCase):  # pylint: disable=too-many-public-meth
         self.assertIn("{{USER}}", watcher_content)
         self.assertIn("{{INSTALL_DIR}}", watcher_content)
 
+        # Both services must agree on the runtime directory.
+        self.assertIn("{{RUNTIME_DIR}}", bell_content)
+        self.assertIn("{{RUNTIME_DIR}}", watcher_content)
+
     @patch.dict(
         os.environ,
         {"INSTALL_DIR": "/test/install", "START_HOUR": "8", "END_HOUR": "22"},
@@ -336,6 +345,100 @@ class TestInstallers(unittest.TestCase):  # pylint: disable=too-many-public-meth
                 f"{script_name} should have multiple echo statements for user feedback",
             )
 
+    def write_stub(self, name, body):
+        """Write an executable stub command logging its calls."""
+        path = os.path.join(self.bin_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'#!/bin/bash\necho "{name} $*" >> "{self.calls}"\n{body}\n')
+        os.chmod(path, 0o755)
+
+    def run_offline_install(self, *args):
+        """Run install.sh from the bundle without network, return its calls."""
+        with open(self.calls, "w", encoding="utf-8"):
+            pass
+        env = dict(
+            os.environ,
+            HOME=self.home,
+            PATH=f"{self.bin_dir}:{os.environ['PATH']}",
+            TMPDIR=self.test_dir,
+        )
+        result = subprocess.run(
+            ["bash", os.path.join(self.script_dir, "install.sh"), "--bundle"]
+            + list(args),
+            capture_output=True,
+            text=True,
+            check=False,
+            env=env,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        with open(self.calls, "r", encoding="utf-8") as f:
+            calls = f.read().splitlines()
+        for tool in ("curl", "wget", "git"):
+            self.assertFalse([c for c in calls if c.startswith(f"{tool} ")])
+        return (result.stdout, [c for c in calls if c.startswith("launchctl load")])
+
+    def test_offline_bundle_install(self):
+        """Test installing from a bundle only updates what changed."""
+        bundle = os.path.join(self.test_dir, "bundle")
+        os.makedirs(self.home)
+        os.makedirs(self.bin_dir)
+        subprocess.run(
+            ["bash", os.path.join(self.script_dir, "make-bundle.sh"), bundle],
+            capture_output=True,
+            check=True,
+        )
+
+        # launchctl keeps the loaded labels in a file, no network tools.
+        loaded = os.path.join(self.test_dir, "loaded")
+        with open(loaded, "w", encoding="utf-8"):
+            pass
+        self.write_stub(
+            "launchctl",
+            f"""label=$(basename "$2" .plist)
+case "$1" in
+    list) sed 's/^/-\t0\t/' "{loaded}" ;;
+    load) echo "$label" >> "{loaded}" ;;
+    unload) grep -vx "$label" "{loaded}" > "{loaded}.new" || true
+            mv "{loaded}.new" "{loaded}" ;;
+esac""",
+        )
+        for tool in ("curl", "wget", "git"):
+            self.write_stub(tool, "exit 1")
+        install_dir = os.path.join(self.home, ".local", "share", "ships-bell")
+
+        _, loads = self.run_offline_install(bundle, "--dry-run")
+        self.assertFalse(os.path.exists(install_dir))
+        self.assertEqual(loads, [])
+
+        _, loads = self.run_offline_install(bundle)
+        self.assertTrue(os.path.exists(os.path.join(install_dir, "ships-bell-watcher")))
+        self.assertTrue(os.path.exists(os.path.join(install_dir, "MANIFEST.sha256")))
+        self.assertEqual(len(loads), 2)
+        # The runtime dir defaults to the user temp dir, private to the user.
+        runtime = os.path.join(self.test_dir, "ships-bell")
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(runtime).st_mode))
+
+        output, loads = self.run_offline_install(bundle)
+        self.assertIn("0 file(s) changed", output)
+        self.assertEqual(loads, [])
+
+        # Change the watcher only and fix up the manifest.
+        with open(os.path.join(bundle, "ships-bell-watcher"), "a", encoding="utf-8") as f:
+            f.write("\n# changed\n")
+        manifest = os.path.join(bundle, "MANIFEST.sha256")
+        with open(manifest, "r", encoding="utf-8") as f:
+            entries = [line.split() for line in f]
+        with open(manifest, "w", encoding="utf-8") as f:
+            for _, path in entries:
+                with open(os.path.join(bundle, path), "rb") as data:
+                    digest = hashlib.sha256(data.read()).hexdigest()
+                f.write(f"{digest}  {path}\n")
+
+        output, loads = self.run_offline_install(bundle)
+        self.assertIn("1 file(s) changed", output)
+        self.assertEqual(len(loads), 1)
+        self.assertIn("ships-bell-watcher.plist", loads[0])
+
 
 if __name__ == "__main__":
     unittest.main()
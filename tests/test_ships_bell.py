@@ -1,20 +1,37 @@
 """Tests for Ship's Bell application."""
 
+import os
+import shutil
+import socket
+import struct
+import subprocess
+import tempfile
+import time
 import unittest
+import wave
 from unittest.mock import Mock, patch
 
-from ships_bell import ShipsBell, ShipsBellError, handle_args
+from ships_bell import (
+    AudioPlayer,
+    ShipsBell,
+    ShipsBellError,
+    handle_args,
+    make_private_dir,
+    runtime_dir,
+)
+from tests.harness import RecordingPlayer, VirtualClock, write_heartbeat
 
 # Tests may use long method names.
 # pylint:disable=invalid-name
 
 
-class TestShipsBell(unittest.TestCase):
+class TestShipsBell(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """Test cases for ShipsBell class."""
 
     def test_step_happy_path(self):
         """Test normal bell striking behavior."""
-        sb = ShipsBell(".", 0, 24)
+        clock = VirtualClock()
+        sb = ShipsBell(".", 0, 24, clock=clock)
         sb.play_single_strike = Mock()
         sb.play_double_strike = Mock()
 
@@ -31,10 +48,12 @@ class TestShipsBell(unittest.TestCase):
         sb.step(4, 0)
         self.assertEqual(4, sb.play_double_strike.call_count)
         self.assertEqual(0, sb.play_single_strike.call_count)
+        # The pauses between strikes pass on the virtual clock.
+        self.assertAlmostEqual(3 * ShipsBell.STRIKE_PAUSE, clock.time())
 
     def test_step_striking_boundary_cases(self):
         """Test bell striking at boundary times."""
-        sb = ShipsBell(".", 0, 24)
+        sb = ShipsBell(".", 0, 24, clock=VirtualClock())
         sb.play_single_strike = Mock()
         sb.play_double_strike = Mock()
 
@@ -59,6 +78,53 @@ class TestShipsBell(unittest.TestCase):
         self.assertEqual(0, sb.play_double_strike.call_count)
         self.assertEqual(1, sb.play_single_strike.call_count)
 
+    def test_all_slots_all_windows(self):
+        """Test all 48 slots of a day for every --from/--to window."""
+
+        def expected_strikes(start, end):
+            strikes = []
+            for minute in range(start * 60, min(end * 60 + 1, 24 * 60), 30):
+                slot = minute // 30
+                # The dog watches from 16:00 to 20:00 count to 4 bells only.
+                if 32 < slot <= 40:
+                    bells = (slot - 33) % 4 + 1
+                else:
+                    bells = (slot - 1) % 8 + 1
+                types = ["double"] * (bells // 2) + ["single"] * (bells % 2)
+                for i, strike_type in enumerate(types):
+                    strikes.append((round(minute * 60 + i * 0.3, 6), strike_type))
+                if minute == 12 * 60:
+                    noon_at = minute * 60 + (len(types) - 1) * 0.3 + 1.0
+                    strikes.append((round(noon_at, 6), "noon"))
+            return strikes
+
+        clock = VirtualClock()
+        for start in range(25):
+            for end in range(start, 25):
+                sb = ShipsBell(".", start, end, clock=clock)
+                sb.player = RecordingPlayer(clock)
+                for minute in range(0, 24 * 60, 30):
+                    clock.now = minute * 60.0
+                    sb.step(minute // 60, minute % 60)
+                played = [(round(t, 6), s) for t, s in sb.player.played]
+                self.assertEqual(expected_strikes(start, end), played, (start, end))
+
+    def test_tick_full_day(self):
+        """Test that the run loop rings every bell of a day in virtual time."""
+        clock = VirtualClock()
+        sb = ShipsBell(".", 9, 20, clock=clock)
+        sb.player = RecordingPlayer(clock)
+        while clock.time() < ShipsBell.SECONDS_PER_DAY:
+            sb.tick()
+
+        schedule = list(sb.compute_schedule())
+        self.assertEqual([s for _, s in schedule], [s for _, s in sb.player.played])
+        # Strikes are at most a second late, the check interval before a bell.
+        for (second, _), (played_at, _) in zip(schedule, sb.player.played):
+            self.assertGreaterEqual(played_at, second)
+            self.assertLess(played_at, second + 1.0)
+        self.assertEqual(1, sb.stats["noon"])
+
     def test_strike_computation(self):
         """Test strike calculation logic for traditional maritime watch system."""
         sb = ShipsBell(".")
@@ -193,42 +259,151 @@ class TestShipsBell(unittest.TestCase):
         self.assertAlmostEqual(60.0, sb.compute_sleep_time(28))
         self.assertAlmostEqual(60.0, sb.compute_sleep_time(58))
 
-    @patch("builtins.open", create=True)
-    @patch("os.makedirs")
-    def test_trigger_files_created(
-        self, mock_makedirs, mock_open
-    ):  # pylint: disable=unused-argument
-        """Test that trigger files are created for audio playback."""
-        sb = ShipsBell(".", 0, 24)
-        mock_file = Mock()
-        mock_open.return_value.__enter__.return_value = mock_file
+    @patch.object(ShipsBell, "watcher_alive", return_value=True)
+    def test_trigger_files_created(self, mock_alive):  # pylint: disable=unused-argument
+        """Test that every strike gets its own trigger file."""
+        sb = ShipsBell(".", 0, 24, clock=VirtualClock(1000.0))
+        runtime = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, runtime)
+        sb.trigger_dir = os.path.join(runtime, "triggers")
 
+        sb.play_double_strike()
+        sb.play_double_strike()
         sb.play_single_strike()
-        mock_open.assert_called()
-        mock_file.write.assert_called()
+        self.assertEqual(
+            [
+                "1000.500000-1_double",
+                "1000.500000-2_double",
+                "1000.500000-3_single",
+            ],
+            sorted(os.listdir(sb.trigger_dir)),
+        )
+
+    def test_trigger_file_error_handling(self):
+        """Test trigger file creation error handling."""
+        clock = VirtualClock(1000.0)
+        sb = ShipsBell(".", 0, 24, clock=clock)
+        sb.trigger_dir = os.path.join(tempfile.mkdtemp(), "triggers")
+        self.addCleanup(shutil.rmtree, os.path.dirname(sb.trigger_dir))
+        os.makedirs(sb.trigger_dir)
+        write_heartbeat(sb.trigger_dir, clock.time())
+        # A trigger file that is already there cannot be created again.
+        os.mkdir(os.path.join(sb.trigger_dir, "1000.500000-1_single"))
 
-        mock_open.reset_mock()
-        mock_file.reset_mock()
+        with self.assertRaises(ShipsBellError):
+            sb.play_single_strike()
+        self.assertEqual(1, sb.stats["errors"])
+        self.assertEqual(0, sb.stats["single"])
+        # The next strike gets a new name and goes through.
+        sb.play_single_strike()
+        self.assertIn("1000.500000-2_single", os.listdir(sb.trigger_dir))
 
-        sb.play_double_strike()
-        mock_open.assert_called()
-        mock_file.write.assert_called()
+    def test_watcher_alive(self):
+        """Test heartbeat based liveness of a watch directory."""
+        watch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, watch_dir)
+        heartbeat_file = os.path.join(watch_dir, "heartbeat")
+        sb = ShipsBell(".")
 
-    @patch("builtins.open", create=True)
-    @patch("os.makedirs")
-    def test_trigger_file_error_handling(
-        self, mock_makedirs, mock_open
-    ):  # pylint: disable=unused-argument
-        """Test trigger file creation error handling."""
+        def beat(timestamp):
+            with open(
+                heartbeat_file, "r+b" if os.path.exists(heartbeat_file) else "wb"
+            ) as f:
+                f.write(struct.pack("d", timestamp))
+
+        # No heartbeat file yet.
+        self.assertFalse(sb.watcher_alive(watch_dir))
+        beat(time.time())
+        self.assertTrue(sb.watcher_alive(watch_dir))
+        # A heartbeat older than the timeout means the watcher is dead.
+        beat(time.time() - 2 * ShipsBell.HEARTBEAT_TIMEOUT)
+        self.assertFalse(sb.watcher_alive(watch_dir))
+        # A replaced heartbeat file is picked up again.
+        os.remove(heartbeat_file)
+        beat(time.time())
+        self.assertTrue(sb.watcher_alive(watch_dir))
+
+    def test_watcher_failover(self):
+        """Test that strikes are played directly when no watcher is alive."""
+        clock = VirtualClock(1000.0)
+        sb = ShipsBell(".", 0, 24, clock=clock)
+        sb.trigger_dir = os.path.join(tempfile.mkdtemp(), "triggers")
+        self.addCleanup(shutil.rmtree, os.path.dirname(sb.trigger_dir))
+        # Past the start-up grace period, failover is immediate.
+        clock.sleep(ShipsBell.HEARTBEAT_TIMEOUT)
+
+        with patch.object(AudioPlayer, "find_command", return_value=["true"]):
+            with patch.object(AudioPlayer, "start") as mock_start:
+                with patch("sys.stderr"):
+                    sb.play_single_strike()
+        mock_start.assert_called_once()
+        # No heartbeat, so no trigger file either.
+        self.assertEqual([], os.listdir(sb.trigger_dir))
+        self.assertEqual(1000.0 + ShipsBell.HEARTBEAT_TIMEOUT, clock.time())
+        self.assertEqual("single", sb.fallback_player.queue.get_nowait())
+        self.assertEqual(1, sb.stats["failovers"])
+        self.assertGreaterEqual(sb.stats["watcher_down"], 1)
+        self.assertFalse(sb.watcher_up)
+        self.assertIn("watcher=down", sb.handle_command("status"))
+
+        # Without any player the strike is lost, but the timer keeps running.
+        sb.fallback_player = None
+        with patch("shutil.which", return_value=None):
+            with patch("sys.stderr"):
+                sb.play_single_strike()
+        self.assertIsNone(sb.fallback_player)
+        self.assertEqual(1, sb.stats["errors"])
+
+    @patch.object(ShipsBell, "watcher_alive", side_effect=[False, False, True])
+    def test_watcher_startup_grace(self, mock_alive):
+        """Test that the first strike waits for a watcher started with us."""
+        clock = VirtualClock(1000.0)
+        sb = ShipsBell(".", 0, 24, clock=clock)
+        runtime = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, runtime)
+        sb.trigger_dir = os.path.join(runtime, "triggers")
+
+        sb.play_double_strike()
+        self.assertEqual(3, mock_alive.call_count)
+        self.assertLess(clock.time(), 1000.0 + ShipsBell.HEARTBEAT_TIMEOUT)
+        self.assertEqual(0, sb.stats["failovers"])
+        self.assertEqual(1, len(os.listdir(sb.trigger_dir)))
+
+    @patch("os.open")
+    def test_single_process_player(self, mock_open):
+        """Test that single-process mode queues strikes instead of writing files."""
         sb = ShipsBell(".", 0, 24)
-        mock_open.side_effect = IOError("Permission denied")
+        sb.player = AudioPlayer(".", command=["true"])
+
+        sb.play_double_strike()
+        sb.play_noon_sound()
+        mock_open.assert_not_called()
+        self.assertEqual("double", sb.player.queue.get_nowait())
+        self.assertEqual("noon", sb.player.queue.get_nowait())
+        self.assertEqual(1, sb.stats["noon"])
+
+    @patch("subprocess.run")
+    def test_audio_player_play_now(self, mock_run):
+        """Test that the player runs its command on the strike's audio file."""
+        player = AudioPlayer("/opt/bell", command=["mpg123", "-q"])
+        player.play_now("single")
+        mock_run.assert_called_once()
+        self.assertEqual(
+            ["mpg123", "-q", "/opt/bell/audio/SingleStrike.mp3"],
+            mock_run.call_args[0][0],
+        )
 
+    @patch("shutil.which", return_value=None)
+    def test_audio_player_missing(self, mock_which):  # pylint: disable=unused-argument
+        """Test that a missing player is reported at startup."""
         with self.assertRaises(ShipsBellError):
-            sb.play_single_strike()
+            _ = AudioPlayer(".")
+        with self.assertRaises(ShipsBellError):
+            _ = handle_args(["this_script", "--single-process"])
 
     def test_respect_silent_period(self):
         """Test silent period functionality."""
-        sb = ShipsBell(".", 9, 17)
+        sb = ShipsBell(".", 9, 17, clock=VirtualClock())
 
         sb.play_single_strike = Mock()
         sb.play_double_strike = Mock()
@@ -261,12 +436,334 @@ class TestShipsBell(unittest.TestCase):
         self.assertEqual(1, sb.play_double_strike.call_count)
         self.assertEqual(0, sb.play_single_strike.call_count)
 
+    def test_compute_schedule(self):
+        """Test that the schedule follows the bell window and strike pattern."""
+        sb = ShipsBell(".", 9, 17)
+        schedule = list(sb.compute_schedule())
+
+        # 09:00 is the first slot, 17:00 the last.
+        self.assertEqual((9 * 3600, "double"), schedule[0])
+        self.assertEqual((17 * 3600, "double"), schedule[-1])
+        # 11:30 - 7 bells: three doubles, then a single.
+        at_1130 = [s for s in schedule if 11.5 * 3600 <= s[0] < 12 * 3600]
+        self.assertEqual(["double"] * 3 + ["single"], [s[1] for s in at_1130])
+        self.assertAlmostEqual(11.5 * 3600 + 0.9, at_1130[-1][0])
+        # Noon sound follows the 8 bells at 12:00.
+        noon = [s[0] for s in schedule if s[1] == "noon"]
+        self.assertEqual(1, len(noon))
+        self.assertAlmostEqual(12 * 3600 + 1.9, noon[0])
+
+        # A second day repeats the first, shifted by 24 hours.
+        two_days = list(sb.compute_schedule(2))
+        self.assertEqual(2 * len(schedule), len(two_days))
+        self.assertEqual(schedule[0][0] + 24 * 3600, two_days[len(schedule)][0])
+
+    def test_render_wav(self):
+        """Test rendering a day of bells to a WAV file."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        output_path = os.path.join(tmp_dir, "bells.wav")
+        clips = {"double": b"\x01\x00" * 3, "single": b"\x02\x00", "noon": b"\x03\x00"}
+
+        sb = ShipsBell(".", 9, 17)
+        sb.decode_audio = Mock(side_effect=lambda strike_type, _: clips[strike_type])
+        frames = sb.render(output_path, days=1, sample_rate=10)
+
+        self.assertEqual(24 * 3600 * 10, frames)
+        with wave.open(output_path, "rb") as f:
+            self.assertEqual(frames, f.getnframes())
+            self.assertEqual(10, f.getframerate())
+            data = f.readframes(f.getnframes())
+
+        # Silence before 09:00, first double strike right at 09:00.
+        start = 9 * 3600 * 10 * 2
+        self.assertEqual(bytes(start), data[:start])
+        self.assertEqual(clips["double"], data[start : start + 6])
+        # Noon sound 1.9 seconds after 12:00.
+        noon = (12 * 3600 * 10 + 19) * 2
+        self.assertEqual(clips["noon"], data[noon : noon + 2])
+        # Nothing after 17:00.
+        end = (17 * 3600 * 10 + 3) * 2
+        self.assertEqual(bytes(len(data) - end), data[end:])
+
+    def test_decode_audio_cache(self):
+        """Test that pre-decoded audio is used instead of decoding."""
+        working_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, working_dir)
+        sb = ShipsBell(working_dir)
+
+        with patch.object(sb, "decode_audio", return_value=b"\x01\x00"):
+            sb.build_audio_cache(8000)
+        cache_file = os.path.join(working_dir, "audio", "cache", "noon-8000.pcm")
+        self.assertTrue(os.path.exists(cache_file))
+        self.assertEqual(b"\x01\x00", sb.decode_audio("noon", 8000))
+
+        # No cache for other sample rates, and no MP3 to decode.
+        with self.assertRaises(ShipsBellError):
+            sb.decode_audio("noon", 44100)
+
+    def test_decode_audio(self):
+        """Test decoding with ffmpeg or afconvert, whichever is installed."""
+        working_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        sb = ShipsBell(working_dir)
+
+        def which(*commands):
+            return lambda command: (
+                f"/usr/bin/{command}" if command in commands else None
+            )
+
+        with patch("shutil.which", side_effect=which("ffmpeg")):
+            with patch("subprocess.run", return_value=Mock(stdout=b"\x01\x00")) as run:
+                self.assertEqual(b"\x01\x00", sb.decode_audio("noon", 8000, False))
+        self.assertEqual("ffmpeg", run.call_args[0][0][0])
+        self.assertIn("8000", run.call_args[0][0])
+
+        def afconvert(command, **kwargs):  # pylint: disable=unused-argument
+            with wave.Wave_write(command[-1]) as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(8000)
+                f.writeframes(b"\x02\x00\x03\x00")
+
+        with patch("shutil.which", side_effect=which("afconvert")):
+            with patch("subprocess.run", side_effect=afconvert):
+                self.assertEqual(
+                    b"\x02\x00\x03\x00", sb.decode_audio("noon", 8000, False)
+                )
+
+        error = subprocess.CalledProcessError(1, "ffmpeg")
+        with patch("shutil.which", side_effect=which("ffmpeg")):
+            with patch("subprocess.run", side_effect=error):
+                with self.assertRaises(ShipsBellError):
+                    sb.decode_audio("noon", 8000, False)
+        with patch("shutil.which", return_value=None):
+            with self.assertRaises(ShipsBellError):
+                sb.decode_audio("noon", 8000, False)
+
+    def test_render_flac(self):
+        """Test rendering to FLAC through flac or ffmpeg."""
+        sb = ShipsBell(".", 9, 17)
+        sb.decode_audio = Mock(return_value=b"\x01\x00")
+
+        for encoder in ["flac", "ffmpeg"]:
+            written = []
+            process = Mock(returncode=0)
+            process.stdin.write.side_effect = written.append
+            with patch("shutil.which", side_effect=lambda c, e=encoder: c == e):
+                with patch("subprocess.Popen", return_value=process) as popen:
+                    frames = sb.render("bells.flac", days=1, sample_rate=10)
+            self.assertEqual(encoder, popen.call_args[0][0][0])
+            self.assertEqual(frames * 2, sum(len(chunk) for chunk in written))
+            process.wait.assert_called_once()
+
+        with patch("shutil.which", return_value=None):
+            with self.assertRaises(ShipsBellError):
+                sb.render("bells.flac", days=1, sample_rate=10)
+
+        # A failing encoder is reported, not a traceback.
+        process = Mock(returncode=1)
+        with patch("shutil.which", return_value="/usr/bin/flac"):
+            with patch("subprocess.Popen", return_value=process):
+                with self.assertRaises(ShipsBellError):
+                    sb.render("bells.flac", days=1, sample_rate=10)
+
+                # Writing to and closing a dead encoder raises BrokenPipeError.
+                process.stdin.write.side_effect = BrokenPipeError()
+                process.stdin.close.side_effect = BrokenPipeError()
+                with self.assertRaises(ShipsBellError):
+                    sb.render("bells.flac", days=1, sample_rate=10)
+        process.wait.assert_called()
+
+    def test_render_wav_too_long(self):
+        """Test that WAV output refuses tracks beyond the RIFF size limit."""
+        sb = ShipsBell(".")
+        sb.decode_audio = Mock(return_value=b"")
+        with self.assertRaises(ShipsBellError):
+            sb.render("unused.wav", days=2, sample_rate=44100)
+
+    def test_handle_args_render(self):
+        """Test argument parsing for render mode."""
+        sb = handle_args(["this_script", "--render", "out.flac", "--days", "3"])
+        self.assertEqual(
+            {"output_path": "out.flac", "days": 3, "sample_rate": 22050},
+            sb.render_options,
+        )
+        self.assertIsNone(handle_args(["this_script"]).render_options)
+        with self.assertRaises(ShipsBellError):
+            _ = handle_args(["this_script", "--render", "out.wav", "--days", "0"])
+
+    def test_runtime_dir(self):
+        """Test the runtime directory preference order."""
+        with patch.dict(os.environ, {"SHIPS_BELL_RUNTIME_DIR": "/run/bell"}):
+            self.assertEqual("/run/bell", runtime_dir())
+            self.assertEqual("/run/bell/triggers", ShipsBell(".").trigger_dir)
+        with patch.dict(
+            os.environ, {"SHIPS_BELL_RUNTIME_DIR": "", "XDG_RUNTIME_DIR": "/run/user/7"}
+        ):
+            self.assertEqual("/run/user/7/ships-bell", runtime_dir())
+        with patch.dict(
+            os.environ, {"SHIPS_BELL_RUNTIME_DIR": "", "XDG_RUNTIME_DIR": ""}
+        ), patch("os.path.isdir", return_value=False):
+            self.assertEqual(
+                os.path.expanduser("~/.local/share/ships-bell"), runtime_dir()
+            )
+
+    @patch.object(ShipsBell, "watcher_alive", return_value=True)
+    def test_trigger_dir_created_once(
+        self, mock_alive
+    ):  # pylint: disable=unused-argument
+        """Test that the trigger directory is not created on every strike."""
+        runtime = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, runtime)
+        sb = ShipsBell(".", 0, 24)
+        sb.trigger_dir = os.path.join(runtime, "triggers")
+
+        with patch(
+            "ships_bell.make_private_dir", wraps=make_private_dir
+        ) as mock_make_dir:
+            sb.play_double_strike()
+            sb.play_double_strike()
+            mock_make_dir.assert_called_once_with(runtime)
+
+            # After a failed write, the directory is created again.
+            shutil.rmtree(sb.trigger_dir)
+            with self.assertRaises(ShipsBellError):
+                sb.play_single_strike()
+            sb.play_single_strike()
+            self.assertEqual(2, mock_make_dir.call_count)
+
+    def test_make_private_dir(self):
+        """Test that runtime directories others could control are refused."""
+        parent = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, parent)
+        path = os.path.join(parent, "runtime")
+        make_private_dir(path)
+        self.assertEqual(0o700, os.stat(path).st_mode & 0o777)
+        # Existing private directories are fine.
+        make_private_dir(path)
+
+        with patch("os.getuid", return_value=os.getuid() + 1):
+            with self.assertRaises(ShipsBellError):
+                make_private_dir(path)
+        os.chmod(path, 0o777)
+        with self.assertRaises(ShipsBellError):
+            make_private_dir(path)
+        link = os.path.join(parent, "link")
+        os.symlink(path, link)
+        with self.assertRaises(ShipsBellError):
+            make_private_dir(link)
+
+    @patch.object(ShipsBell, "watcher_alive", return_value=True)
+    def test_zone_dirs_cached(self, mock_alive):  # pylint: disable=unused-argument
+        """Test that zone directories are not listed on every strike."""
+        runtime = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, runtime)
+        clock = VirtualClock(1000.0)
+        sb = ShipsBell(".", 0, 24, clock=clock)
+        sb.trigger_dir = os.path.join(runtime, "triggers")
+        zone = os.path.join(sb.trigger_dir, "zones", "lounge")
+
+        with patch.object(ShipsBell, "zone_dirs", return_value=[]) as mock_zones:
+            sb.play_double_strike()
+            os.makedirs(zone)
+            sb.play_double_strike()
+            mock_zones.assert_called_once()
+        # A zone registered since is picked up on the heartbeat cadence.
+        clock.sleep(ShipsBell.HEARTBEAT_INTERVAL)
+        sb.play_single_strike()
+        self.assertEqual(["1001.000000-3_single"], os.listdir(zone))
+
+    def test_next_bell(self):
+        """Test next bell lookup from the precomputed slots."""
+        sb = ShipsBell(".", 9, 17)
+
+        def at(hours, minutes, seconds=0):
+            return time.struct_time((2025, 1, 1, hours, minutes, seconds, 0, 1, -1))
+
+        self.assertEqual((9, 0, 2, 3600), sb.next_bell(at(8, 0)))
+        self.assertEqual((11, 30, 7, 59), sb.next_bell(at(11, 29, 1)))
+        # The bell of the current minute counts as rung.
+        self.assertEqual((12, 0, 8, 1800), sb.next_bell(at(11, 30)))
+        # After the window, wrap around to tomorrow.
+        self.assertEqual((9, 0, 2, 16 * 3600 - 60), sb.next_bell(at(17, 1)))
+
+    def test_handle_command(self):
+        """Test control socket commands."""
+        sb = ShipsBell(".", 9, 17)
+        sb.play_single_strike = Mock()
+        sb.play_double_strike = Mock()
+
+        self.assertTrue(sb.handle_command("status").startswith("ok running from=9"))
+        self.assertRegex(sb.handle_command("next-bell"), r"^ok \d\d:[03]0 bells=\d")
+        self.assertIn("double=0", sb.handle_command("stats"))
+
+        with patch("time.sleep"):
+            self.assertEqual("ok rang 5", sb.handle_command("ring 5\n"))
+        self.assertEqual(2, sb.play_double_strike.call_count)
+        self.assertEqual(1, sb.play_single_strike.call_count)
+
+        self.assertTrue(sb.handle_command("ring 9").startswith("error"))
+        self.assertTrue(sb.handle_command("ring x").startswith("error"))
+        self.assertTrue(sb.handle_command("ring").startswith("error"))
+        self.assertTrue(sb.handle_command("").startswith("error"))
+        self.assertTrue(sb.handle_command("reboot").startswith("error"))
+
+    def test_control_server(self):
+        """Test a round trip through the control socket."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        socket_path = os.path.join(tmp_dir, "control.sock")
+
+        sb = ShipsBell(".", 0, 24)
+        server = sb.start_control_server(socket_path)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(b"status\nstats\n")
+            with client.makefile("rb") as replies:
+                self.assertTrue(replies.readline().startswith(b"ok running"))
+                self.assertTrue(replies.readline().startswith(b"ok double=0"))
+
+    def test_control_server_in_use(self):
+        """Test that a running server's socket is not taken over."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        socket_path = os.path.join(tmp_dir, "control.sock")
+
+        server = ShipsBell(".").start_control_server(socket_path)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with self.assertRaises(ShipsBellError):
+            ShipsBell(".").start_control_server(socket_path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+
+        # A socket left behind by a dead process is taken over.
+        stale_path = os.path.join(tmp_dir, "stale.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(stale_path)
+        server = ShipsBell(".").start_control_server(stale_path)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        # Other files are left alone.
+        other_path = os.path.join(tmp_dir, "other")
+        with open(other_path, "w", encoding="utf-8"):
+            pass
+        with self.assertRaises(ShipsBellError):
+            ShipsBell(".").start_control_server(other_path)
+
     def test_handle_args_no_explicit_args(self):
         """Test argument parsing with defaults."""
         args1 = ["this_script"]
         sb = handle_args(args1)
         self.assertEqual(9, sb.start_time)
         self.assertEqual(20, sb.end_time)
+        self.assertEqual(os.path.join(runtime_dir(), "control.sock"), sb.control_socket)
+        sb = handle_args(["this_script", "--control-socket", ""])
+        self.assertIsNone(sb.control_socket)
 
     def test_handle_args_from_to(self):
         """Test argument parsing with custom times."""
@@ -0,0 +1,260 @@
+"""Tests for the Ship's Bell audio watcher."""
+
+import importlib.machinery
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from ships_bell import ShipsBell
+from tests.harness import RecordingPlayer, VirtualClock, write_heartbeat
+
+# Tests may use long method names.
+# pylint:disable=invalid-name
+
+WATCHER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ships-bell-watcher"
+)
+# Watchers of all zones should start a strike within this many seconds.
+SYNC_TARGET = 0.01
+
+
+def load_watcher():
+    """Import the watcher script, which has no .py suffix."""
+    loader = importlib.machinery.SourceFileLoader("ships_bell_watcher", WATCHER_PATH)
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+class TestWatcher(unittest.TestCase):
+    """Test cases for ships-bell-watcher."""
+
+    def setUp(self):
+        """Point the watcher at a temporary runtime directory."""
+        self.home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home)
+        self.env = {"SHIPS_BELL_RUNTIME_DIR": self.home}
+        with patch.dict(os.environ, self.env):
+            self.watcher = load_watcher()
+
+    def test_parse_trigger(self):
+        """Test that trigger names are parsed and other files ignored."""
+        self.assertEqual(
+            (1234.5, 7, "double"), self.watcher.parse_trigger("1234.500000-7_double")
+        )
+        for name in ["heartbeat", "played", "zones", "1234.5-x_double", "1-1_gong"]:
+            self.assertIsNone(self.watcher.parse_trigger(name))
+
+    def test_wait_until(self):
+        """Test that waiting ends within the 10 ms sync target."""
+        start_at = time.time() + 0.05
+        offset = self.watcher.wait_until(start_at)
+        self.assertGreaterEqual(offset, 0.0)
+        self.assertLess(offset, SYNC_TARGET)
+        # Start times in the past return immediately.
+        self.assertGreater(self.watcher.wait_until(time.time() - 1.0), 0.9)
+
+    def test_play_audio_offset(self):
+        """Test that the offset includes starting the player process."""
+        audio_file = os.path.join(self.home, "bell.mp3")
+        with open(audio_file, "wb"):
+            pass
+        real_popen = subprocess.Popen
+
+        def slow_popen(*args, **kwargs):
+            time.sleep(0.05)
+            return real_popen(*args, **kwargs)
+
+        with patch("subprocess.Popen", side_effect=slow_popen):
+            offset = self.watcher.play_audio(audio_file, time.time(), "true")
+        self.assertGreaterEqual(offset, 0.05)
+        with patch("sys.stderr"):
+            self.assertIsNone(self.watcher.play_audio(audio_file, None, "/no/player"))
+
+    def test_decide(self):
+        """Test the lateness budget decisions."""
+        self.assertEqual("play", self.watcher.decide(-0.5))
+        self.assertEqual("play", self.watcher.decide(0.9, late_budget=1.0))
+        self.assertEqual("compress", self.watcher.decide(5.0, late_budget=1.0))
+        self.assertEqual("drop", self.watcher.decide(61.0, drop_after=60.0))
+
+    def test_handle_triggers(self):
+        """Test that pending triggers are handled in start time order."""
+        now = time.time()
+        for seq, (strike_type, start_at) in enumerate(
+            [("noon", now - 10.0), ("double", now - 3600.0), ("single", now)]
+        ):
+            trigger_name = f"{start_at:.6f}-{seq}_{strike_type}"
+            with open(os.path.join(self.home, trigger_name), "w", encoding="utf-8"):
+                pass
+        self.watcher.SHIPS_BELL_DIR = os.path.dirname(WATCHER_PATH)
+
+        with patch("sys.stdout"):
+            decisions = self.watcher.handle_triggers(self.home, player="true")
+        self.assertEqual(
+            [
+                ("double", "drop"),
+                ("noon", "compress"),
+                ("single", "play"),
+            ],
+            decisions,
+        )
+        self.assertEqual([], self.watcher.pending_triggers(self.home))
+
+    def test_virtual_clock_triggers(self):
+        """Test bells from ShipsBell to watcher decisions in virtual time."""
+        clock = VirtualClock(1000.0)
+        sb = ShipsBell(".", clock=clock)
+        sb.trigger_dir = self.watcher.TRIGGER_DIR
+        os.makedirs(sb.trigger_dir)
+        recorder = RecordingPlayer(clock)
+
+        def step_and_handle(hours, minutes, delay):
+            # A heartbeat in virtual time keeps the watcher alive.
+            write_heartbeat(sb.trigger_dir, clock.time())
+            sb.step(hours, minutes)
+            clock.sleep(delay)
+            with patch("sys.stdout"):
+                return self.watcher.handle_triggers(
+                    sb.trigger_dir, clock=clock, play=recorder.play_audio
+                )
+
+        self.assertEqual(
+            [("single", "play")], step_and_handle(0, 30, ShipsBell.SYNC_LEAD)
+        )
+        self.assertEqual([(1000.5, "single")], recorder.played)
+
+        # Late bells are played shortened right away, stale bells dropped.
+        self.assertEqual([("double", "compress")], step_and_handle(1, 0, 5.0))
+        self.assertEqual((1005.5, "double"), recorder.played[-1])
+        self.assertEqual([("double", "drop")] * 2, step_and_handle(2, 0, 120.0))
+        self.assertEqual(2, len(recorder.played))
+        self.assertEqual(0, sb.stats["failovers"])
+
+    def test_backlog_decisions(self):
+        """Test that all strikes of 8 bells and noon play in full at clip length."""
+        clock = VirtualClock(1000.0)
+        sb = ShipsBell(".", clock=clock)
+        sb.trigger_dir = self.watcher.TRIGGER_DIR
+        os.makedirs(sb.trigger_dir)
+        # The watcher keeps beating while the noon sound is triggered.
+        write_heartbeat(sb.trigger_dir, clock.time() + 2 * ShipsBell.HEARTBEAT_TIMEOUT)
+        sb.step(12, 0)
+
+        # Each strike plays as long as its bundled clip, far longer than the
+        # pause between the strikes.
+        clips = {
+            strike_type: self.watcher.clip_seconds(
+                os.path.join(os.path.dirname(WATCHER_PATH), "audio", audio_file)
+            )
+            for strike_type, audio_file in ShipsBell.AUDIO_FILES.items()
+        }
+        self.assertGreater(min(clips.values()), 1.0)
+        watcher_clock = VirtualClock(1000.0 + ShipsBell.SYNC_LEAD)
+        recorder = RecordingPlayer(watcher_clock, duration=clips)
+        with patch("sys.stdout"):
+            decisions = self.watcher.handle_triggers(
+                sb.trigger_dir, clock=watcher_clock, play=recorder.play_audio
+            )
+        self.assertEqual([("double", "play")] * 4 + [("noon", "play")], decisions)
+        # Every strike starts when the one before has ended.
+        start_at = 1000.0 + ShipsBell.SYNC_LEAD
+        for played_at, strike_type in recorder.played:
+            self.assertAlmostEqual(start_at, played_at)
+            start_at += clips[strike_type]
+
+        # A player stuck for longer than the budget makes the next strike late.
+        recorder.duration = dict(clips, double=clips["double"] + 5.0)
+        clock.now = watcher_clock.now + 1800.0
+        write_heartbeat(sb.trigger_dir, clock.time())
+        sb.step(14, 0)
+        watcher_clock.now = clock.time()
+        with patch("sys.stdout"):
+            decisions = self.watcher.handle_triggers(
+                sb.trigger_dir, clock=watcher_clock, play=recorder.play_audio
+            )
+        self.assertEqual([("double", "play"), ("double", "compress")], decisions)
+
+    def test_heartbeat(self):
+        """Test that a running watcher is seen alive by ShipsBell."""
+        self.watcher.start_heartbeat(self.home)
+        self.assertTrue(ShipsBell(".").watcher_alive(self.home))
+
+    def test_strikes_all_played(self):
+        """Test that strikes 0.3 s apart all play despite the start time lead."""
+        log_file = os.path.join(self.home, "watcher.log")
+        with open(log_file, "w", encoding="utf-8") as log:
+            watcher = subprocess.Popen(  # pylint: disable=consider-using-with
+                [sys.executable, "-u", WATCHER_PATH, "--player", "false"],
+                env=dict(os.environ, **self.env),
+                stdout=log,
+            )
+        self.addCleanup(watcher.wait)
+        self.addCleanup(watcher.kill)
+
+        with patch.dict(os.environ, self.env):
+            sb = ShipsBell(".")
+        deadline = time.time() + 10.0
+        while time.time() < deadline and not sb.watcher_alive(sb.trigger_dir):
+            time.sleep(0.01)
+
+        sb.step(4, 0)
+        deadline = time.time() + 10.0
+        while time.time() < deadline:
+            with open(log_file, "r", encoding="utf-8") as f:
+                played = f.read().count("Played double")
+            if played == 4:
+                break
+            time.sleep(0.05)
+        self.assertEqual(4, played)
+
+    def test_loopback_skew(self):
+        """Test that N watchers with null sinks start their players together.
+
+        Real runs stay within a few ms, the bound is the 10 ms sync target.
+        """
+        zones = ["zone1", "zone2", "zone3"]
+        env = dict(os.environ, **self.env)
+        watchers = [
+            subprocess.Popen(  # pylint: disable=consider-using-with
+                [sys.executable, WATCHER_PATH, "--zone", zone, "--player", "true"],
+                env=env,
+                stdout=subprocess.DEVNULL,
+            )
+            for zone in zones
+        ]
+        for watcher in watchers:
+            self.addCleanup(watcher.wait)
+            self.addCleanup(watcher.kill)
+
+        # Wait for every zone to register and beat.
+        with patch.dict(os.environ, self.env):
+            sb = ShipsBell(".")
+        deadline = time.time() + 10.0
+        while time.time() < deadline:
+            if all(sb.watcher_alive(self.watcher.zone_dir(zone)) for zone in zones):
+                break
+            time.sleep(0.01)
+
+        with patch("sys.stderr"):
+            sb.play_single_strike()
+
+        deadline = time.time() + 10.0
+        while time.time() < deadline:
+            offsets, skew = self.watcher.measure_skew()
+            if len(offsets) == len(zones):
+                break
+            time.sleep(0.05)
+        self.assertEqual(len(zones), len(offsets))
+        self.assertLess(skew, SYNC_TARGET)
+
+
+if __name__ == "__main__":
+    unittest.main()